@@ -6,7 +6,7 @@ import uuid
 from sqlalchemy.orm import Session
 
 from jobs_bot.config import Settings, get_settings, validate_settings
-from jobs_bot.db import make_session_factory
+from jobs_bot.db import check_schema, make_session_factory
 from jobs_bot.enrich_llm import enrich_pending_jobs
 from jobs_bot.fit_scoring import compute_fit_scores_for_profile
 from jobs_bot.ingest_ats import ingest_all_sources
@@ -25,6 +25,7 @@ def run_pipeline(session: Session, *, settings: Settings, logger) -> dict[str, i
         "notion_synced": 0,
     }
 
+    check_schema(session)
     logger.info("ingest_start", extra={"event": "ingest_start"})
 
     ok, created = ingest_all_sources(
@@ -77,18 +78,18 @@ def run_pipeline(session: Session, *, settings: Settings, logger) -> dict[str, i
         if not settings.profiles_dir:
             raise RuntimeError("SYNC_TO_NOTION requires PROFILES_DIR (multi-profile mode)")
 
-        notion = NotionClient(
+        with NotionClient(
             token=settings.notion_token,
             version=settings.notion_version,
             data_source_id=settings.notion_data_source_id,
-        )
-        synced = sync_pending_jobs(
-            session,
-            notion=notion,
-            limit=settings.sync_limit,
-            fit_min=settings.fit_min,
-            profile_id=settings.profile_id,
-        )
+        ) as notion:
+            synced = sync_pending_jobs(
+                session,
+                notion=notion,
+                limit=settings.sync_limit,
+                fit_min=settings.fit_min,
+                profile_id=settings.profile_id,
+            )
         results["notion_synced"] = int(synced)
 
     logger.info("ingest_done", extra={"event": "ingest_done", **results})
@@ -1,10 +1,18 @@
 from __future__ import annotations
 
-from sqlalchemy import Engine, create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import Engine, create_engine, inspect
+from sqlalchemy.orm import Session, sessionmaker
 
 from .config import Settings
 
+# Columns added to existing tables after their first release. There are no
+# migrations and create_all() never alters a table, so older installs run these.
+_ADDED_COLUMNS: dict[tuple[str, str], str] = {
+    ("job_profile", "notion_props_sha256"): (
+        "ALTER TABLE job_profile ADD COLUMN notion_props_sha256 VARCHAR(64) NULL"
+    ),
+}
+
 
 def make_engine(settings: Settings) -> Engine:
     return create_engine(
@@ -18,3 +26,14 @@ def make_engine(settings: Settings) -> Engine:
 def make_session_factory(settings: Settings) -> sessionmaker:
     engine = make_engine(settings)
     return sessionmaker(bind=engine, autoflush=False, expire_on_commit=False, future=True)
+
+
+def check_schema(session: Session) -> None:
+    """Fail fast, naming the ALTER to run, when an added column is missing."""
+    inspector = inspect(session.get_bind())
+    columns: dict[str, set[str]] = {}
+    for (table, column), alter in _ADDED_COLUMNS.items():
+        if table not in columns:
+            columns[table] = {c["name"] for c in inspector.get_columns(table)}
+        if column not in columns[table]:
+            raise RuntimeError(f"Missing column {table}.{column}; run: {alter}")
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import datetime as dt
 
-from sqlalchemy import DateTime, Enum, ForeignKey, Integer, JSON, String, Text, text, func
+from sqlalchemy import DateTime, Enum, ForeignKey, Index, Integer, JSON, String, Text, text, func
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
@@ -36,6 +36,10 @@ class Source(Base):
 
 class Job(Base):
     __tablename__ = "jobs"
+    __table_args__ = (
+        # ORDER BY last_seen DESC in sync/scoring (a B-tree is scanned backwards)
+        Index("ix_jobs_last_seen", "last_seen"),
+    )
 
     job_uid: Mapped[str] = mapped_column(String(40), primary_key=True)  # SHA1 hex
     source_id: Mapped[int] = mapped_column(ForeignKey("sources.id"), nullable=False)
@@ -124,6 +128,10 @@ class Profile(Base):
 
 class JobProfile(Base):
     __tablename__ = "job_profile"
+    __table_args__ = (
+        # sync_pending_jobs: profile_id = ? AND fit_score >= ? AND notion_last_sync ...
+        Index("ix_job_profile_sync_filter", "profile_id", "fit_score", "notion_last_sync"),
+    )
 
     job_uid: Mapped[str] = mapped_column(ForeignKey("jobs.job_uid"), primary_key=True)
     profile_id: Mapped[str] = mapped_column(ForeignKey("profiles.profile_id"), primary_key=True)
@@ -143,6 +151,8 @@ class JobProfile(Base):
     notion_page_id: Mapped[str | None] = mapped_column(String(36), nullable=True)
     notion_last_sync: Mapped[dt.datetime | None] = mapped_column(DateTime, nullable=True)
     notion_last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # SHA256 of the last properties payload written to Notion (skip no-op updates)
+    notion_props_sha256: Mapped[str | None] = mapped_column(String(64), nullable=True)
 
     created_at: Mapped[dt.datetime] = mapped_column(DateTime, nullable=False, server_default=func.now())
     updated_at: Mapped[dt.datetime] = mapped_column(
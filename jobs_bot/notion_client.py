@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import time
 from dataclasses import dataclass
 from typing import Any
 
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 
 
 class NotionError(RuntimeError):
@@ -17,6 +20,14 @@ class NotionConfig:
     data_source_id: str
     timeout_s: int = 20
     base_url: str = "https://api.notion.com/v1"
+    max_retries_429: int = 3
+    backoff_base_s: float = 1.0
+    pool_maxsize: int = 10
+
+
+def _encode_body(payload: dict[str, Any]) -> bytes:
+    """Serialize a request body once (the session sends Content-Type: application/json)."""
+    return orjson.dumps(payload)
 
 
 class NotionClient:
@@ -29,8 +40,17 @@ class NotionClient:
             data_source_id=data_source_id,
             timeout_s=timeout_s,
         )
-
+        # Endpoint URLs are fixed per client; build them once.
+        self._query_url = f"{self._cfg.base_url}/data_sources/{self._cfg.data_source_id}/query"
+        self._pages_url = f"{self._cfg.base_url}/pages"
+
+        # One keep-alive pool per client: TCP/TLS setup is paid once per batch.
+        # sync_pending_jobs shares it across worker threads. That is safe because
+        # the session is never reconfigured after this block: headers and adapter
+        # are only read, urllib3's pool is thread-safe and the cookie jar locks.
         self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self._cfg.pool_maxsize)
+        self._session.mount("https://", adapter)
         self._session.headers.update(
             {
                 "Authorization": f"Bearer {self._cfg.token}",
@@ -43,10 +63,43 @@ class NotionClient:
     def data_source_id(self) -> str:
         return self._cfg.data_source_id
 
+    def close(self) -> None:
+        """Release pooled connections."""
+        self._session.close()
+
+    def __enter__(self) -> NotionClient:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
     def _raise_for_error(self, resp: requests.Response) -> None:
         if resp.status_code >= 400:
             raise NotionError(f"Notion error {resp.status_code}: {resp.text}")
 
+    def _send(self, method: str, url: str, payload: dict[str, Any]) -> requests.Response:
+        """
+        Send one request, retrying on HTTP 429 (rate limited).
+
+        Waits for `Retry-After` when Notion sends it, otherwise backs off
+        exponentially. The last 429 response is returned as-is.
+        """
+        send = getattr(self._session, method)
+        body = _encode_body(payload)
+        delay = self._cfg.backoff_base_s
+        for attempt in range(self._cfg.max_retries_429 + 1):
+            resp = send(url, data=body, timeout=self._cfg.timeout_s)
+            if resp.status_code != 429 or attempt == self._cfg.max_retries_429:
+                return resp
+
+            try:
+                wait_s = float(resp.headers.get("Retry-After") or delay)
+            except ValueError:
+                wait_s = delay
+            time.sleep(wait_s)
+            delay *= 2
+        return resp
+
     def query_page_id(self, *, job_uid: str, profile_id: str | None = None) -> str | None:
         """
         Find an existing page by Job UID and optional Profile.
@@ -61,8 +114,7 @@ class NotionClient:
 
         payload = {"filter": {"and": filters}, "page_size": 1}
 
-        url = f"{self._cfg.base_url}/data_sources/{self._cfg.data_source_id}/query"
-        resp = self._session.post(url, json=payload, timeout=self._cfg.timeout_s)
+        resp = self._send("post", self._query_url, payload)
         self._raise_for_error(resp)
 
         data = resp.json()
@@ -71,6 +123,41 @@ class NotionClient:
             return None
         return results[0].get("id")
 
+    def list_pages_by_profile(self, profile_id: str, *, page_size: int = 100) -> dict[str, str]:
+        """
+        Return `{job_uid: page_id}` for every page tagged with the given Profile.
+
+        Pages through the data source query endpoint, so a whole sync batch can
+        resolve existing pages with O(pages / page_size) calls instead of one
+        query per job.
+        """
+        url = self._query_url
+        payload: dict[str, Any] = {
+            "filter": {"property": "Profile", "rich_text": {"equals": profile_id}},
+            "page_size": page_size,
+        }
+
+        out: dict[str, str] = {}
+        cursor: str | None = None
+        while True:
+            body = {**payload, "start_cursor": cursor} if cursor else payload
+            resp = self._send("post", url, body)
+            self._raise_for_error(resp)
+
+            data = resp.json()
+            for page in data.get("results") or []:
+                items = ((page.get("properties") or {}).get("Job UID") or {}).get("rich_text") or []
+                if not items:
+                    continue
+                job_uid = items[0].get("plain_text") or (items[0].get("text") or {}).get("content")
+                if job_uid and page.get("id"):
+                    # Keep the first match, consistent with query_page_id().
+                    out.setdefault(job_uid, page["id"])
+
+            cursor = data.get("next_cursor")
+            if not data.get("has_more") or not cursor:
+                return out
+
     def create_page(self, *, properties: dict[str, Any], children: list[dict[str, Any]] | None = None) -> str:
         """
         Create a new page under the configured data source.
@@ -78,7 +165,7 @@ class NotionClient:
         Uses `parent.data_source_id`. If your workspace still requires `database_id`,
         this method automatically falls back.
         """
-        url = f"{self._cfg.base_url}/pages"
+        url = self._pages_url
 
         payload: dict[str, Any] = {
             "parent": {"data_source_id": self._cfg.data_source_id},
@@ -87,18 +174,18 @@ class NotionClient:
         if children:
             payload["children"] = children
 
-        resp = self._session.post(url, json=payload, timeout=self._cfg.timeout_s)
+        resp = self._send("post", url, payload)
         if resp.status_code == 400:
             # Fallback for older workspaces that still only accept database_id
             payload["parent"] = {"database_id": self._cfg.data_source_id}
-            resp = self._session.post(url, json=payload, timeout=self._cfg.timeout_s)
+            resp = self._send("post", url, payload)
 
         self._raise_for_error(resp)
         return resp.json()["id"]
 
     def update_page(self, *, page_id: str, properties: dict[str, Any]) -> None:
-        url = f"{self._cfg.base_url}/pages/{page_id}"
-        resp = self._session.patch(url, json={"properties": properties}, timeout=self._cfg.timeout_s)
+        url = f"{self._pages_url}/{page_id}"
+        resp = self._send("patch", url, {"properties": properties})
         self._raise_for_error(resp)
 
     # Backward-compatible alias (single-profile legacy)
@@ -1,19 +1,77 @@
 from __future__ import annotations
 
 import datetime as dt
+import hashlib
 import json
-from typing import Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Literal, NamedTuple
 
+import orjson
 from sqlalchemy import exists, or_, select
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm import Session, joinedload, load_only, raiseload, selectinload
 
 from .models import Job, JobEnrichment, JobProfile, Profile, Source
 from .notion_client import NotionClient, NotionError
 
 
-def _as_date(value: dt.datetime | None) -> str:
+class _SyncItem(NamedTuple):
+    """One (job_profile, job) pair queued for Notion sync."""
+
+    job_profile: JobProfile
+    job: Job
+
+
+# Commit Notion mappings in small batches: keeps job_profile transactions short
+# and persists created page ids even if a later row aborts the run.
+_SYNC_COMMIT_EVERY = 25
+
+# Unmapped rows needed before existing pages are resolved by listing the whole
+# profile (one request per 100 pages) instead of one query per row. Below
+# this, a large page history would cost more requests than it saves.
+_BULK_LOOKUP_MIN_UNMAPPED = 20
+
+# Concurrent Notion writes per batch. Matches Notion's documented average of
+# ~3 requests/s per integration, so 429 backoff stays the exception: rows that
+# exhaust its retries are recorded as failed although nothing was wrong.
+_SYNC_MAX_WORKERS = 3
+
+# Only the columns the property builders read; anything else stays deferred and
+# any relationship not listed here raises instead of lazy-loading per row.
+_SYNC_LOAD_OPTIONS = (
+    # many-to-one: join it into the main query instead of a second round-trip
+    joinedload(Job.source).load_only(Source.ats_type).raiseload("*"),
+    selectinload(Job.enrichment)
+    .load_only(
+        JobEnrichment.summary,
+        JobEnrichment.skills_json,
+        JobEnrichment.pros,
+        JobEnrichment.cons,
+        JobEnrichment.salary,
+        JobEnrichment.outreach_target,
+    )
+    .raiseload("*"),
+    load_only(
+        Job.job_uid,
+        Job.source_id,
+        Job.title,
+        Job.company,
+        Job.url,
+        Job.location_raw,
+        Job.workplace_raw,
+        Job.salary_text,
+        Job.first_seen,
+        Job.last_seen,
+        Job.last_checked,
+        Job.fit_score,
+        Job.fit_class,
+    ),
+    raiseload("*"),
+)
+
+
+def _as_date(value: dt.datetime | None, *, today: dt.date | None = None) -> str:
     if value is None:
-        return dt.date.today().isoformat()
+        return (today or dt.date.today()).isoformat()
     return value.date().isoformat()
 
 
@@ -29,24 +87,35 @@ def _title(value: str | None) -> dict[str, Any]:
     return {"title": [{"text": {"content": txt}}]}
 
 
+# Fit scores are clamped to 0..100, so both mappings are precomputed once.
+_FIT_CLASS_BY_SCORE: tuple[str, ...] = tuple(
+    "Good" if s >= 75 else "Maybe" if s >= 60 else "No" for s in range(101)
+)
+_STATUS_BY_SCORE: tuple[str, ...] = tuple(
+    "Shortlist" if s >= 75 else "New" if s >= 60 else "Rejected" for s in range(101)
+)
+
+
 def _fit_class_from_score(score: int | None) -> str:
     if score is None:
         return "No"
-    if score >= 75:
-        return "Good"
-    if score >= 60:
-        return "Maybe"
-    return "No"
+    return _FIT_CLASS_BY_SCORE[min(100, max(0, score))]
 
 
 def _status_for_new_page(score: int | None) -> str:
     if score is None:
         return "New"
-    if score >= 75:
-        return "Shortlist"
-    if score >= 60:
-        return "New"
-    return "Rejected"
+    return _STATUS_BY_SCORE[min(100, max(0, score))]
+
+
+def _penalty_flags_json(flags: dict[str, Any]) -> str:
+    """
+    Pretty JSON for the "Penalty flags" property.
+
+    Always orjson: the text is part of notion_props_sha256, and json.dumps
+    formats some floats differently (1e+16 vs 1e16), which would rewrite pages.
+    """
+    return orjson.dumps(flags, option=orjson.OPT_SORT_KEYS | orjson.OPT_INDENT_2).decode("utf-8")
 
 
 def _source_label(source: Source | None) -> str:
@@ -65,14 +134,24 @@ def _region_multi_select(source: Source | None) -> list[dict[str, str]]:
     return [{"name": str(hint)[:100]}]
 
 
-def build_properties_for_create(
+def _build_properties(
     *,
     job: Job,
     job_profile: JobProfile,
     enrich: JobEnrichment | None,
     profile_id: str,
-    src: Source | None = None,
+    src: Source | None,
+    today: dt.date | None,
+    mode: Literal["create", "update"],
 ) -> dict[str, Any]:
+    """
+    Build the Notion properties payload for a new page or an existing one.
+
+    Create-only fields (Job URL, Status, First seen, empty placeholders) are
+    not sent on update, so e.g. a Status changed by hand in Notion is kept. Enrichment
+    text fields are set when not None; on create an empty value renders the
+    same `{"rich_text": []}` as the placeholders.
+    """
     source = getattr(job, "source", None) or src
     salary = (getattr(enrich, "salary", None) or job.salary_text or "").strip() or None
 
@@ -82,12 +161,9 @@ def build_properties_for_create(
         "Job UID": _rt(job.job_uid),
         "Profile": _rt(profile_id),
         "Company": _rt(job.company),
-        "Job URL": {"url": job.url},
-        "Status": {"status": {"name": _status_for_new_page(score)}},
         "Fit score": {"number": score},
         "Fit class": {"select": {"name": _fit_class_from_score(score)}},
-        "First seen": {"date": {"start": _as_date(job.first_seen)}},
-        "Last checked": {"date": {"start": _as_date(job.last_checked)}},
+        "Last checked": {"date": {"start": _as_date(job.last_checked, today=today)}},
         "Source": {"select": {"name": _source_label(source)}},
         "Region": {"multi_select": _region_multi_select(source)},
     }
@@ -99,36 +175,78 @@ def build_properties_for_create(
     if salary:
         props["Salary"] = _rt(salary)
 
-    if job_profile.penalty_flags:
-        props["Penalty flags"] = _rt(
-            json.dumps(job_profile.penalty_flags, ensure_ascii=False, sort_keys=True, indent=2)
-        )
-
-    if enrich:
-        if enrich.summary:
-            props["Summary"] = _rt(enrich.summary)
-        if enrich.pros:
-            props["Pros"] = _rt(enrich.pros)
-        if enrich.cons:
-            props["Cons"] = _rt(enrich.cons)
-        if enrich.outreach_target:
-            props["Best outreach target"] = _rt(enrich.outreach_target)
+    # Update writes empty flags so stale ones get cleared; create drops them below.
+    if job_profile.penalty_flags is not None:
+        props["Penalty flags"] = _rt(_penalty_flags_json(job_profile.penalty_flags))
+
+    if enrich is not None:
+        for key, value in (
+            ("Summary", enrich.summary),
+            ("Pros", enrich.pros),
+            ("Cons", enrich.cons),
+            ("Best outreach target", enrich.outreach_target),
+        ):
+            if value is not None:
+                props[key] = _rt(value)
         if enrich.skills_json and isinstance(enrich.skills_json, dict):
             skills = enrich.skills_json.get("skills") or []
-            if isinstance(skills, list) and skills:
+            if isinstance(skills, list):
+                # Skills are almost always short strings: skip str() and the slice then.
+                names = (s if type(s) is str else str(s) for s in skills if s)
                 props["Skills required"] = {
-                    "multi_select": [{"name": str(s)[:100]} for s in skills if s]
+                    "multi_select": [{"name": n if len(n) <= 100 else n[:100]} for n in names]
                 }
 
-    props.setdefault("Summary", {"rich_text": []})
-    props.setdefault("Pros", {"rich_text": []})
-    props.setdefault("Cons", {"rich_text": []})
-    props.setdefault("Best outreach target", {"rich_text": []})
-    props.setdefault("Contact", {"rich_text": []})
+    if mode == "create":
+        return _with_create_fields(props, job=job, job_profile=job_profile, today=today)
+    return props
+
 
+def _with_create_fields(
+    update_props: dict[str, Any],
+    *,
+    job: Job,
+    job_profile: JobProfile,
+    today: dt.date | None,
+) -> dict[str, Any]:
+    """
+    Derive the create payload from an already built update payload.
+
+    Only the create-only fields are added, so a row that falls through to
+    create does not pay for a second full property build. The input is not
+    modified (values are shared, read-only dicts).
+    """
+    props = dict(update_props)
+    props["Job URL"] = {"url": job.url}
+    props["Status"] = {"status": {"name": _status_for_new_page(int(job_profile.fit_score or 0))}}
+    props["First seen"] = {"date": {"start": _as_date(job.first_seen, today=today)}}
+    if not job_profile.penalty_flags:
+        props.pop("Penalty flags", None)
+    for key in ("Summary", "Pros", "Cons", "Best outreach target", "Contact"):
+        props.setdefault(key, {"rich_text": []})
     return props
 
 
+def build_properties_for_create(
+    *,
+    job: Job,
+    job_profile: JobProfile,
+    enrich: JobEnrichment | None,
+    profile_id: str,
+    src: Source | None = None,
+    today: dt.date | None = None,
+) -> dict[str, Any]:
+    return _build_properties(
+        job=job,
+        job_profile=job_profile,
+        enrich=enrich,
+        profile_id=profile_id,
+        src=src,
+        today=today,
+        mode="create",
+    )
+
+
 def build_properties_for_update(
     *,
     job: Job,
@@ -136,52 +254,143 @@ def build_properties_for_update(
     enrich: JobEnrichment | None,
     profile_id: str,
     src: Source | None = None,
+    today: dt.date | None = None,
 ) -> dict[str, Any]:
-    source = getattr(job, "source", None) or src
-    salary = (getattr(enrich, "salary", None) or job.salary_text or "").strip() or None
+    return _build_properties(
+        job=job,
+        job_profile=job_profile,
+        enrich=enrich,
+        profile_id=profile_id,
+        src=src,
+        today=today,
+        mode="update",
+    )
 
-    score = int(job_profile.fit_score or 0)
-    props: dict[str, Any] = {
-        "Job Title": _title(job.title),
-        "Job UID": _rt(job.job_uid),
-        "Profile": _rt(profile_id),
-        "Company": _rt(job.company),
-        "Fit score": {"number": score},
-        "Fit class": {"select": {"name": _fit_class_from_score(score)}},
-        "Last checked": {"date": {"start": _as_date(job.last_checked)}},
-        "Source": {"select": {"name": _source_label(source)}},
-        "Region": {"multi_select": _region_multi_select(source)},
-    }
 
-    if job.location_raw:
-        props["Location"] = _rt(job.location_raw)
-    if job.workplace_raw:
-        props["Workplace"] = {"select": {"name": job.workplace_raw}}
-    if salary:
-        props["Salary"] = _rt(salary)
+def _props_sha256(props: dict[str, Any]) -> str:
+    """Stable fingerprint of a properties payload (key order independent)."""
+    blob = json.dumps(props, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
 
-    if job_profile.penalty_flags is not None:
-        props["Penalty flags"] = _rt(
-            json.dumps(job_profile.penalty_flags, ensure_ascii=False, sort_keys=True, indent=2)
-        )
 
-    if enrich:
-        if enrich.summary is not None:
-            props["Summary"] = _rt(enrich.summary)
-        if enrich.pros is not None:
-            props["Pros"] = _rt(enrich.pros)
-        if enrich.cons is not None:
-            props["Cons"] = _rt(enrich.cons)
-        if enrich.outreach_target is not None:
-            props["Best outreach target"] = _rt(enrich.outreach_target)
-        if enrich.skills_json and isinstance(enrich.skills_json, dict):
-            skills = enrich.skills_json.get("skills") or []
-            if isinstance(skills, list):
-                props["Skills required"] = {
-                    "multi_select": [{"name": str(s)[:100]} for s in skills if s]
-                }
+class _SyncAction(NamedTuple):
+    """
+    Notion write planned for one row.
 
-    return props
+    Built in the calling thread from ORM state; holds only plain values so it
+    can be executed from a worker thread without touching the session.
+    """
+
+    item: _SyncItem
+    job_uid: str
+    # noop: payload unchanged; lookup: no page id cache, query Notion first
+    kind: Literal["noop", "update", "create", "lookup"]
+    page_id: str | None
+    update_props: dict[str, Any]
+    create_props: dict[str, Any] | None
+    props_sha256: str
+
+
+def _plan_sync(
+    item: _SyncItem,
+    *,
+    profile_id: str,
+    page_id_cache: dict[str, str] | None,
+    today: dt.date,
+) -> _SyncAction:
+    """Decide the Notion write for one row (no I/O)."""
+    job, job_profile = item.job, item.job_profile
+    enrich = job.enrichment
+
+    # Built once: sent on both update paths and fingerprinted after a create.
+    update_props = build_properties_for_update(
+        job=job,
+        job_profile=job_profile,
+        enrich=enrich,
+        profile_id=profile_id,
+        today=today,
+    )
+    props_sha256 = _props_sha256(update_props)
+
+    page_id = job_profile.notion_page_id
+    if page_id:
+        kind = "noop" if props_sha256 == job_profile.notion_props_sha256 else "update"
+        return _SyncAction(item, job.job_uid, kind, page_id, update_props, None, props_sha256)
+
+    if page_id_cache is not None:
+        page_id = page_id_cache.get(job.job_uid)
+        if page_id:
+            return _SyncAction(item, job.job_uid, "update", page_id, update_props, None, props_sha256)
+
+    create_props = _with_create_fields(update_props, job=job, job_profile=job_profile, today=today)
+    kind = "create" if page_id_cache is not None else "lookup"
+    return _SyncAction(item, job.job_uid, kind, None, update_props, create_props, props_sha256)
+
+
+def _execute_sync(notion: NotionClient, action: _SyncAction, *, profile_id: str) -> str | None:
+    """Perform the planned Notion calls; returns the page id. HTTP only."""
+    if action.kind == "noop":
+        return action.page_id
+
+    page_id = action.page_id
+    if action.kind == "lookup":
+        page_id = notion.query_page_id(job_uid=action.job_uid, profile_id=profile_id)
+
+    if page_id:
+        notion.update_page(page_id=page_id, properties=action.update_props)
+        return page_id
+
+    return notion.create_page(properties=action.create_props)
+
+
+def _apply_sync(action: _SyncAction, *, page_id: str | None, error: str | None, now: dt.datetime) -> None:
+    """Record the outcome of one Notion write on its job_profile row."""
+    job_profile = action.item.job_profile
+    if error is not None:
+        if action.page_id:
+            job_profile.notion_page_id = action.page_id
+        job_profile.notion_last_error = error
+        return
+
+    job_profile.notion_page_id = page_id
+    # The update payload is what the next sync compares against.
+    job_profile.notion_props_sha256 = action.props_sha256
+    job_profile.notion_last_error = None
+    job_profile.notion_last_sync = now
+
+
+def _dispatch_sync_actions(
+    notion: NotionClient,
+    actions: list[_SyncAction],
+    *,
+    profile_id: str,
+    now: dt.datetime,
+    pool: ThreadPoolExecutor,
+) -> Exception | None:
+    """
+    Run the Notion writes of one batch concurrently and apply the results.
+
+    Notion API errors are recorded per row. The first unexpected exception is
+    returned (after every other result is applied) so the caller can commit
+    the pages already written before re-raising it.
+    """
+    futures = [
+        None if a.kind == "noop" else pool.submit(_execute_sync, notion, a, profile_id=profile_id)
+        for a in actions
+    ]
+
+    failure: Exception | None = None
+    for action, future in zip(actions, futures):
+        try:
+            page_id = action.page_id if future is None else future.result()
+        except NotionError as exc:
+            _apply_sync(action, page_id=None, error=str(exc), now=now)
+            continue
+        except Exception as exc:  # noqa: BLE001 (persist finished rows, then re-raise)
+            failure = failure or exc
+            continue
+        _apply_sync(action, page_id=page_id, error=None, now=now)
+    return failure
 
 
 def upsert_job_profile_to_notion(
@@ -192,49 +401,53 @@ def upsert_job_profile_to_notion(
     job_profile: JobProfile,
     profile_id: str,
     now: dt.datetime,
+    page_id_cache: dict[str, str] | None = None,
+    today: dt.date | None = None,
 ) -> None:
-    enrich = job.enrichment
-
+    """
+    Create or update the Notion page for one (job, profile) pair.
+
+    When `page_id_cache` is given (see `NotionClient.list_pages_by_profile`),
+    existing pages are resolved from it instead of querying Notion per job.
+    Batch callers pass `today` (derived from `now`) so it is computed once.
+
+    Updates whose payload matches the last one written (`notion_props_sha256`)
+    are skipped; only the sync markers are refreshed.
+    """
+    action = _plan_sync(
+        _SyncItem(job_profile, job),
+        profile_id=profile_id,
+        page_id_cache=page_id_cache,
+        today=today or now.date(),
+    )
     try:
-        if job_profile.notion_page_id:
-            props = build_properties_for_update(
-                job=job,
-                job_profile=job_profile,
-                enrich=enrich,
-                profile_id=profile_id,
-            )
-            notion.update_page(page_id=job_profile.notion_page_id, properties=props)
-            job_profile.notion_last_error = None
-            job_profile.notion_last_sync = now
-            return
-
-        existing_page_id = notion.query_page_id(job_uid=job.job_uid, profile_id=profile_id)
-        if existing_page_id:
-            job_profile.notion_page_id = existing_page_id
-            props = build_properties_for_update(
-                job=job,
-                job_profile=job_profile,
-                enrich=enrich,
-                profile_id=profile_id,
-            )
-            notion.update_page(page_id=existing_page_id, properties=props)
-            job_profile.notion_last_error = None
-            job_profile.notion_last_sync = now
-            return
-
-        props = build_properties_for_create(
-            job=job,
-            job_profile=job_profile,
-            enrich=enrich,
-            profile_id=profile_id,
-        )
-        page_id = notion.create_page(properties=props)
-        job_profile.notion_page_id = page_id
-        job_profile.notion_last_error = None
-        job_profile.notion_last_sync = now
-
+        page_id = _execute_sync(notion, action, profile_id=profile_id)
     except NotionError as exc:
-        job_profile.notion_last_error = str(exc)
+        _apply_sync(action, page_id=None, error=str(exc), now=now)
+        return
+    _apply_sync(action, page_id=page_id, error=None, now=now)
+
+
+def _partition_sync_items(
+    items: list[_SyncItem],
+    page_id_cache: dict[str, str] | None,
+) -> tuple[list[_SyncItem], list[_SyncItem]]:
+    """
+    Split items into (pages to update, pages to create).
+
+    Without a page id cache, unmapped items cannot be classified up front and
+    go to the second list; they are looked up in Notion when dispatched.
+    """
+    to_update: list[_SyncItem] = []
+    to_create: list[_SyncItem] = []
+    for item in items:
+        if item.job_profile.notion_page_id or (
+            page_id_cache is not None and item.job.job_uid in page_id_cache
+        ):
+            to_update.append(item)
+        else:
+            to_create.append(item)
+    return to_update, to_create
 
 
 def sync_pending_jobs(
@@ -256,7 +469,7 @@ def sync_pending_jobs(
     stmt = (
         select(JobProfile, Job)
         .join(Job, Job.job_uid == JobProfile.job_uid)
-        .options(selectinload(Job.source), selectinload(Job.enrichment))
+        .options(*_SYNC_LOAD_OPTIONS)
         .where(
             JobProfile.profile_id == profile_id,
             JobProfile.fit_score >= fit_min,
@@ -273,7 +486,10 @@ def sync_pending_jobs(
         .limit(limit)
     )
 
-    rows: list[tuple[JobProfile, Job]] = list(session.execute(stmt).all())
+    # Materialized on purpose (bounded by SYNC_LIMIT <= 500): the loop below
+    # commits every _SYNC_COMMIT_EVERY rows, and committing while a streamed
+    # (yield_per) cursor is still open is not supported by MySQL drivers.
+    rows: list[_SyncItem] = [_SyncItem(jp, job) for jp, job in session.execute(stmt)]
 
     # Backward-compatible path: when a job_profile row does not exist yet
     # (e.g. first ever run, or older DB state), we can still sync using
@@ -284,7 +500,7 @@ def sync_pending_jobs(
     if len(rows) < limit:
         missing_stmt = (
             select(Job)
-            .options(selectinload(Job.source), selectinload(Job.enrichment))
+            .options(*_SYNC_LOAD_OPTIONS)
             .where(
                 Job.fit_score >= fit_min,
                 ~exists(
@@ -314,17 +530,44 @@ def sync_pending_jobs(
                 fit_computed_at=now,
             )
             session.add(jp)
-            rows.append((jp, job))
-
-    for jp, job in rows:
-        upsert_job_profile_to_notion(
-            session,
-            notion,
-            job=job,
-            job_profile=jp,
-            profile_id=profile_id,
-            now=now,
-        )
-
-    session.commit()
+            rows.append(_SyncItem(jp, job))
+
+    # Many unmapped rows: resolve existing pages with one listing instead of
+    # one query per job. Few: the per-job lookups are cheaper.
+    page_id_cache: dict[str, str] | None = None
+    unmapped = sum(1 for item in rows if not item.job_profile.notion_page_id)
+    if unmapped >= _BULK_LOOKUP_MIN_UNMAPPED:
+        try:
+            page_id_cache = notion.list_pages_by_profile(profile_id)
+        except NotionError:
+            # Fall back to per-job lookups; errors are recorded per row there.
+            page_id_cache = None
+
+    # Known pages first, then new ones. Commit batches run over this one ordered
+    # list, so the batch at the boundary can mix updates and creates.
+    to_update, to_create = _partition_sync_items(rows, page_id_cache)
+    # Batch constant, computed once.
+    today = now.date()
+
+    # The batch commits must not expire the loaded rows: with the default
+    # expire_on_commit=True, every row written after the first commit would be
+    # refreshed with its own SELECT before its UPDATE.
+    expire_on_commit = session.expire_on_commit
+    session.expire_on_commit = False
+    try:
+        ordered = to_update + to_create
+        with ThreadPoolExecutor(max_workers=_SYNC_MAX_WORKERS) as pool:
+            for start in range(0, len(ordered), _SYNC_COMMIT_EVERY):
+                actions = [
+                    _plan_sync(item, profile_id=profile_id, page_id_cache=page_id_cache, today=today)
+                    for item in ordered[start : start + _SYNC_COMMIT_EVERY]
+                ]
+                failure = _dispatch_sync_actions(notion, actions, profile_id=profile_id, now=now, pool=pool)
+                session.commit()
+                if failure is not None:
+                    raise failure
+
+        session.commit()
+    finally:
+        session.expire_on_commit = expire_on_commit
     return len(rows)
@@ -1,25 +1,130 @@
+import datetime as dt
 import uuid
+from collections.abc import Callable
 from dataclasses import dataclass, field
 from typing import Any
 
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
 
-from jobs_bot.models import Base
+from jobs_bot.models import Base, Job, JobProfile, Profile, Source
 
 
-@pytest.fixture()
+@pytest.fixture(scope="session")
 def sqlite_engine():
-    engine = create_engine("sqlite+pysqlite:///:memory:", future=True)
+    # One in-memory database for the whole run; the schema is created once.
+    engine = create_engine(
+        "sqlite+pysqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+
+    # pysqlite's own transaction handling breaks SAVEPOINT; let SQLAlchemy emit BEGIN.
+    @event.listens_for(engine, "connect")
+    def _no_pysqlite_begin(dbapi_connection, _record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
     Base.metadata.create_all(engine)
-    return engine
+    yield engine
+    engine.dispose()
 
 
 @pytest.fixture()
 def sqlite_session(sqlite_engine):
-    with Session(sqlite_engine) as session:
-        yield session
+    # Each test runs in an outer transaction that is rolled back afterwards;
+    # commits inside the test only release savepoints.
+    with sqlite_engine.connect() as conn:
+        trans = conn.begin()
+        with Session(bind=conn, join_transaction_mode="create_savepoint") as session:
+            yield session
+        trans.rollback()
+
+
+FIXTURE_NOW = dt.datetime(2026, 1, 3)
+
+
+# Factories only add to the session; tests commit once after their setup.
+@pytest.fixture()
+def make_source(sqlite_session) -> Callable[..., Source]:
+    def _make(**fields: Any) -> Source:
+        src = Source(
+            **{
+                "ats_type": "lever",
+                "company_slug": "acme",
+                "company_name": "ACME",
+                "api_base": "https://api.lever.co/v0/postings/acme",
+                "is_active": 1,
+                "discovered_via": "manual",
+                **fields,
+            }
+        )
+        sqlite_session.add(src)
+        return src
+
+    return _make
+
+
+@pytest.fixture()
+def make_profile(sqlite_session) -> Callable[..., Profile]:
+    def _make(profile_id: str = "default", **fields: Any) -> Profile:
+        profile = Profile(
+            **{"profile_id": profile_id, "cv_path": "/tmp/cv.docx", "cv_sha256": "a" * 64, **fields}
+        )
+        sqlite_session.add(profile)
+        return profile
+
+    return _make
+
+
+@pytest.fixture()
+def make_job(sqlite_session) -> Callable[..., Job]:
+    def _make(source: Source, job_uid: str, **fields: Any) -> Job:
+        job = Job(
+            **{
+                "job_uid": job_uid,
+                "source": source,
+                "ats_job_id": "1",
+                "title": "Backend Engineer",
+                "company": "ACME",
+                "url": "https://example.com",
+                "first_seen": FIXTURE_NOW,
+                "last_seen": FIXTURE_NOW,
+                "last_checked": FIXTURE_NOW,
+                "raw_json": {},
+                **fields,
+            }
+        )
+        sqlite_session.add(job)
+        return job
+
+    return _make
+
+
+@pytest.fixture()
+def make_job_profile(sqlite_session) -> Callable[..., JobProfile]:
+    def _make(job: Job, profile_id: str = "default", **fields: Any) -> JobProfile:
+        job_profile = JobProfile(
+            **{
+                "job_uid": job.job_uid,
+                "profile_id": profile_id,
+                "fit_score": 80,
+                "fit_class": "Good",
+                "fit_job_last_checked": FIXTURE_NOW,
+                "fit_profile_cv_sha256": "a" * 64,
+                "fit_computed_at": FIXTURE_NOW,
+                **fields,
+            }
+        )
+        sqlite_session.add(job_profile)
+        return job_profile
+
+    return _make
 
 
 @dataclass
@@ -30,11 +135,19 @@ class FakeNotionClient:
     created_payloads: list[dict[str, Any]] = field(default_factory=list)
     updated_payloads: list[dict[str, Any]] = field(default_factory=list)
 
+    closed: bool = False
+
+    def __enter__(self) -> "FakeNotionClient":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.closed = True
+
     def _read_rich_text(self, properties: dict[str, Any], key: str) -> str | None:
-        items = (properties.get(key) or {}).get("rich_text") or []
-        if not items:
+        try:
+            return properties[key]["rich_text"][0]["text"]["content"]
+        except (KeyError, IndexError, TypeError):
             return None
-        return items[0]["text"]["content"]
 
     def create_page(self, properties: dict) -> str:
         page_id = str(uuid.uuid4())
@@ -66,6 +179,13 @@ class FakeNotionClient:
     def query_page_id(self, *, job_uid: str, profile_id: str) -> str | None:
         return self.job_uid_profile_to_page.get((job_uid, profile_id))
 
+    def list_pages_by_profile(self, profile_id: str) -> dict[str, str]:
+        return {
+            job_uid: page_id
+            for (job_uid, pid), page_id in self.job_uid_profile_to_page.items()
+            if pid == profile_id
+        }
+
 
 @pytest.fixture()
 def fake_notion() -> FakeNotionClient:
@@ -1,17 +1,22 @@
 from __future__ import annotations
 
+import pytest
 import responses
 
 from jobs_bot.ats_clients import fetch_greenhouse_jobs_page, fetch_lever_postings
 
 
-@responses.activate
-def test_fetch_lever_postings_appends_mode_json_and_parses():
+@pytest.fixture()
+def mocked_responses():
+    with responses.RequestsMock() as rsps:
+        yield rsps
+
+
+def test_fetch_lever_postings_appends_mode_json_and_parses(mocked_responses):
     base = "https://api.lever.co/v0/postings/testco"
     url = f"{base}?mode=json"
 
-    responses.add(
-        responses.GET,
+    mocked_responses.get(
         url,
         json=[
             {
@@ -33,13 +38,11 @@ def test_fetch_lever_postings_appends_mode_json_and_parses():
     assert jobs[0]["salary_text"] == "€ 80,000 - € 100,000"
 
 
-@responses.activate
-def test_fetch_greenhouse_jobs_page_parses_jobs_list():
+def test_fetch_greenhouse_jobs_page_parses_jobs_list(mocked_responses):
     api_base = "https://boards-api.greenhouse.io/v1/boards/acme"
     url = f"{api_base}/jobs"
 
-    responses.add(
-        responses.GET,
+    mocked_responses.get(
         url,
         json={
             "jobs": [
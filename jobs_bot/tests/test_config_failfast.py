@@ -1,10 +1,13 @@
+import dataclasses
+
 import pytest
 
 from jobs_bot.config import Settings, validate_settings
 
 
-def _base_settings(**overrides):
-    s = Settings(
+@pytest.fixture(scope="module")
+def base_settings() -> Settings:
+    return Settings(
         notion_token="",
         notion_version="2025-09-03",
         notion_data_source_id="",
@@ -24,16 +27,14 @@ def _base_settings(**overrides):
         max_new_jobs_per_day=200,
         sync_to_notion=0,
     )
-    data = {**s.__dict__, **overrides}
-    return Settings(**data)
 
 
-def test_validate_settings_allows_no_notion_when_sync_disabled():
-    s = _base_settings(sync_to_notion=0, notion_token="", notion_data_source_id="")
+def test_validate_settings_allows_no_notion_when_sync_disabled(base_settings):
+    s = dataclasses.replace(base_settings, sync_to_notion=0, notion_token="", notion_data_source_id="")
     validate_settings(s)  # should not raise
 
 
-def test_validate_settings_requires_notion_when_sync_enabled():
-    s = _base_settings(sync_to_notion=1, notion_token="", notion_data_source_id="")
+def test_validate_settings_requires_notion_when_sync_enabled(base_settings):
+    s = dataclasses.replace(base_settings, sync_to_notion=1, notion_token="", notion_data_source_id="")
     with pytest.raises(RuntimeError):
         validate_settings(s)
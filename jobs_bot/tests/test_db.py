@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from jobs_bot.db import check_schema
+
+
+def test_check_schema_accepts_current_schema(sqlite_session):
+    check_schema(sqlite_session)
+
+
+def test_check_schema_names_missing_column_and_alter():
+    # A job_profile table from before the sync fingerprint column.
+    engine = create_engine("sqlite+pysqlite://")
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE job_profile (job_uid VARCHAR(40), profile_id VARCHAR(64))")
+
+    with Session(engine) as session, pytest.raises(RuntimeError) as excinfo:
+        check_schema(session)
+
+    assert "job_profile.notion_props_sha256" in str(excinfo.value)
+    assert "ALTER TABLE job_profile ADD COLUMN notion_props_sha256 VARCHAR(64) NULL" in str(excinfo.value)
+    engine.dispose()
@@ -1,81 +1,55 @@
 from __future__ import annotations
 
 import datetime as dt
+from unittest.mock import create_autospec
 
-from jobs_bot.enrich_llm import enrich_pending_jobs
-from jobs_bot.models import Job, JobEnrichment, Source
-
-
-class DummyClient:
-    def __init__(self) -> None:
-        self.calls: int = 0
-
-    def enrich_job(
-        self,
-        *,
-        title: str,
-        company: str,
-        location_raw: str | None,
-        workplace_raw: str | None,
-        url: str,
-        salary_text: str | None,
-        raw_text: str | None,
-    ):
-        self.calls += 1
-        return type(
-            "DummyEnrichment",
-            (),
-            {
-                "summary": "Short summary",
-                "skills": ["Python", "SQLAlchemy"],
-                "pros": ["Good scope"],
-                "cons": ["Unclear level"],
-                "outreach_target": "Hiring Manager",
-                "salary": "EUR 50k-70k / year",
-                "model": "dummy-model",
-                "total_tokens": 123,
-            },
-        )()
-
-
-def test_enrich_creates_row(sqlite_session):
-    src = Source(
-        ats_type="lever",
-        company_slug="acme",
-        company_name="ACME",
-        api_base="https://api.lever.co/v0/postings/acme",
-        is_active=1,
-        discovered_via="manual",
-    )
-    sqlite_session.add(src)
-    sqlite_session.commit()
+import pytest
 
-    job = Job(
-        job_uid="a" * 40,
-        source_id=src.id,
-        ats_job_id="1",
-        title="Backend Engineer",
-        company="ACME",
-        url="https://example.com",
+from jobs_bot.enrich_llm import enrich_pending_jobs
+from jobs_bot.llm_client import LlmEnrichment, OpenAIResponsesClient
+from jobs_bot.models import JobEnrichment
+
+
+_ENRICHMENT = LlmEnrichment(
+    summary="Short summary",
+    skills=["Python", "SQLAlchemy"],
+    pros=["Good scope"],
+    cons=["Unclear level"],
+    outreach_target="Hiring Manager",
+    salary="EUR 50k-70k / year",
+    model="dummy-model",
+    total_tokens=123,
+)
+
+
+@pytest.fixture()
+def llm_client():
+    # Autospec keeps the fake in sync with the real client's enrich_job signature.
+    client = create_autospec(OpenAIResponsesClient, instance=True)
+    client.enrich_job.return_value = _ENRICHMENT
+    return client
+
+
+def test_enrich_creates_row(sqlite_session, make_source, make_job, llm_client):
+    job = make_job(
+        make_source(),
+        "a" * 40,
         first_seen=dt.datetime(2026, 1, 1),
         last_seen=dt.datetime(2026, 1, 1),
         last_checked=dt.datetime(2026, 1, 2),
-        raw_json={},
         fit_score=80,
         fit_class="Good",
         salary_text="€60k",
         raw_text="We need Python and SQLAlchemy.",
     )
-    sqlite_session.add(job)
     sqlite_session.commit()
 
-    client = DummyClient()
-    stats = enrich_pending_jobs(sqlite_session, client=client, limit=10)
+    stats = enrich_pending_jobs(sqlite_session, client=llm_client, limit=10)
 
     assert stats.attempted == 1
     assert stats.enriched == 1
     assert stats.failed == 0
-    assert client.calls == 1
+    assert llm_client.enrich_job.call_count == 1
 
     enr = sqlite_session.get(JobEnrichment, job.job_uid)
     assert enr is not None
@@ -88,34 +62,20 @@ def test_enrich_creates_row(sqlite_session):
     assert enr.enriched_at is not None
 
 
-def test_enrich_skips_if_up_to_date(sqlite_session):
-    src = Source(
-        ats_type="lever",
-        company_slug="acme",
-        company_name="ACME",
-        api_base="https://api.lever.co/v0/postings/acme",
-        is_active=1,
-        discovered_via="manual",
-    )
-    sqlite_session.add(src)
-    sqlite_session.commit()
-
+def test_enrich_skips_if_up_to_date(sqlite_session, make_source, make_job, llm_client):
     job_uid = "b" * 40
-    job = Job(
-        job_uid=job_uid,
-        source_id=src.id,
+    make_job(
+        make_source(),
+        job_uid,
         ats_job_id="2",
         title="Data Engineer",
-        company="ACME",
         url="https://example.com/2",
         first_seen=dt.datetime(2026, 1, 1),
         last_seen=dt.datetime(2026, 1, 1),
         last_checked=dt.datetime(2026, 1, 1),
-        raw_json={},
         fit_score=80,
         fit_class="Good",
     )
-    sqlite_session.add(job)
 
     enr = JobEnrichment(
         job_uid=job_uid,
@@ -128,8 +88,7 @@ def test_enrich_skips_if_up_to_date(sqlite_session):
     sqlite_session.add(enr)
     sqlite_session.commit()
 
-    client = DummyClient()
-    stats = enrich_pending_jobs(sqlite_session, client=client, limit=10)
+    stats = enrich_pending_jobs(sqlite_session, client=llm_client, limit=10)
 
     assert stats.attempted == 0 or stats.enriched == 0
-    assert client.calls == 0
+    llm_client.enrich_job.assert_not_called()
@@ -1,27 +1,17 @@
 from __future__ import annotations
 
 from jobs_bot.ingest_ats import ingest_all_sources
-from jobs_bot.models import Job, Source
+from jobs_bot.models import Job
 
 
-def test_ingest_all_sources_ingests_jobs(sqlite_session, monkeypatch):
-    lever = Source(
-        ats_type="lever",
-        company_slug="acme",
-        company_name="ACME",
-        api_base="https://api.lever.co/v0/postings/acme",
-        is_active=1,
-        discovered_via="manual",
-    )
-    gh = Source(
+def test_ingest_all_sources_ingests_jobs(sqlite_session, monkeypatch, make_source):
+    make_source()
+    make_source(
         ats_type="greenhouse",
         company_slug="stripe",
         company_name="Stripe",
         api_base="https://boards-api.greenhouse.io/v1/boards/stripe",
-        is_active=1,
-        discovered_via="manual",
     )
-    sqlite_session.add_all([lever, gh])
     sqlite_session.commit()
 
     def _fake_lever(_api_base: str, timeout_s: int = 20):
@@ -54,16 +44,8 @@ def test_ingest_all_sources_ingests_jobs(sqlite_session, monkeypatch):
     assert sqlite_session.query(Job).count() == 3
 
 
-def test_ingest_respects_max_fetch_per_run(sqlite_session, monkeypatch):
-    lever = Source(
-        ats_type="lever",
-        company_slug="acme",
-        company_name="ACME",
-        api_base="https://api.lever.co/v0/postings/acme",
-        is_active=1,
-        discovered_via="manual",
-    )
-    sqlite_session.add(lever)
+def test_ingest_respects_max_fetch_per_run(sqlite_session, monkeypatch, make_source):
+    make_source()
     sqlite_session.commit()
 
     def _fake_lever(_api_base: str, timeout_s: int = 20):
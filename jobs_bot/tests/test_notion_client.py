@@ -1,15 +1,20 @@
 from __future__ import annotations
 
+import json
 from typing import Any
 
-from jobs_bot.notion_client import NotionClient
+import pytest
+
+from jobs_bot import notion_client
+from jobs_bot.notion_client import NotionClient, NotionError
 
 
 class _FakeResponse:
-    def __init__(self, status_code: int, payload: dict[str, Any]):
+    def __init__(self, status_code: int, payload: dict[str, Any], headers: dict[str, str] | None = None):
         self.status_code = status_code
         self._payload = payload
         self.text = str(payload)
+        self.headers: dict[str, str] = headers or {}
 
     def json(self) -> dict[str, Any]:
         return self._payload
@@ -24,15 +29,19 @@ class _FakeSession:
     def queue(self, resp: _FakeResponse) -> None:
         self._next.append(resp)
 
-    def post(self, url: str, json: dict[str, Any], timeout: int) -> _FakeResponse:
-        self.calls.append({"method": "POST", "url": url, "json": json, "timeout": timeout})
+    def post(self, url: str, data: bytes, timeout: int) -> _FakeResponse:
+        self.calls.append({"method": "POST", "url": url, "json": json.loads(data), "timeout": timeout})
         return self._next.pop(0)
 
-    def patch(self, url: str, json: dict[str, Any], timeout: int) -> _FakeResponse:
-        self.calls.append({"method": "PATCH", "url": url, "json": json, "timeout": timeout})
+    def patch(self, url: str, data: bytes, timeout: int) -> _FakeResponse:
+        self.calls.append({"method": "PATCH", "url": url, "json": json.loads(data), "timeout": timeout})
         return self._next.pop(0)
 
 
+def _no_sleep(_seconds: float) -> None:
+    return None
+
+
 def test_query_page_id_includes_profile_filter(monkeypatch):
     client = NotionClient(token="t", version="v", data_source_id="ds", timeout_s=5)
     fake = _FakeSession()
@@ -60,3 +69,88 @@ def test_query_page_id_without_profile(monkeypatch):
 
     flt = fake.calls[0]["json"]["filter"]["and"]
     assert flt == [{"property": "Job UID", "rich_text": {"equals": "abc"}}]
+
+
+def test_list_pages_by_profile_follows_cursor():
+    client = NotionClient(token="t", version="v", data_source_id="ds", timeout_s=5)
+    fake = _FakeSession()
+    fake.queue(
+        _FakeResponse(
+            200,
+            {
+                "results": [
+                    {"id": "page1", "properties": {"Job UID": {"rich_text": [{"plain_text": "uid1"}]}}},
+                ],
+                "has_more": True,
+                "next_cursor": "c1",
+            },
+        )
+    )
+    fake.queue(
+        _FakeResponse(
+            200,
+            {
+                "results": [
+                    {"id": "page2", "properties": {"Job UID": {"rich_text": [{"text": {"content": "uid2"}}]}}},
+                    {"id": "page3", "properties": {"Job UID": {"rich_text": []}}},
+                ],
+                "has_more": False,
+                "next_cursor": None,
+            },
+        )
+    )
+    client._session = fake  # type: ignore[attr-defined]
+
+    pages = client.list_pages_by_profile("p1")
+    assert pages == {"uid1": "page1", "uid2": "page2"}
+
+    assert len(fake.calls) == 2
+    assert fake.calls[0]["json"]["filter"] == {"property": "Profile", "rich_text": {"equals": "p1"}}
+    assert "start_cursor" not in fake.calls[0]["json"]
+    assert fake.calls[1]["json"]["start_cursor"] == "c1"
+
+
+def test_update_page_retries_on_429(monkeypatch):
+    sleeps: list[float] = []
+    monkeypatch.setattr(notion_client.time, "sleep", sleeps.append)
+
+    client = NotionClient(token="t", version="v", data_source_id="ds", timeout_s=5)
+    fake = _FakeSession()
+    fake.queue(_FakeResponse(429, {"code": "rate_limited"}, headers={"Retry-After": "2"}))
+    fake.queue(_FakeResponse(429, {"code": "rate_limited"}))
+    fake.queue(_FakeResponse(200, {"id": "page1"}))
+    client._session = fake  # type: ignore[attr-defined]
+
+    client.update_page(page_id="page1", properties={"Fit score": {"number": 80}})
+
+    assert [c["method"] for c in fake.calls] == ["PATCH", "PATCH", "PATCH"]
+    # Retry-After first, then the exponential fallback (base 1s, doubled once).
+    assert sleeps == [2.0, 2.0]
+
+
+def test_update_page_gives_up_after_max_429_retries(monkeypatch):
+    monkeypatch.setattr(notion_client.time, "sleep", _no_sleep)
+
+    client = NotionClient(token="t", version="v", data_source_id="ds", timeout_s=5)
+    fake = _FakeSession()
+    for _ in range(4):
+        fake.queue(_FakeResponse(429, {"code": "rate_limited"}))
+    client._session = fake  # type: ignore[attr-defined]
+
+    with pytest.raises(NotionError):
+        client.update_page(page_id="page1", properties={})
+    assert len(fake.calls) == 4
+
+
+def test_client_reuses_pooled_keep_alive_connections():
+    with NotionClient(token="t", version="v", data_source_id="ds", timeout_s=5) as client:
+        adapter = client._session.get_adapter("https://api.notion.com/v1/pages")  # type: ignore[attr-defined]
+        assert adapter._pool_maxsize == 10
+        assert client._session.headers.get("Connection") != "close"  # type: ignore[attr-defined]
+
+
+def test_request_body_is_compact_utf8_json():
+    payload = {"properties": {"Company": {"rich_text": [{"text": {"content": "Café"}}]}}}
+
+    body = notion_client._encode_body(payload)
+    assert body == '{"properties":{"Company":{"rich_text":[{"text":{"content":"Café"}}]}}}'.encode("utf-8")
@@ -92,3 +92,5 @@ def test_ingest_run_pipeline_happy_path_orders_steps(sqlite_session, tmp_path, f
     assert results["jobs_enriched"] == 1
     assert results["jobs_scored"] == 1
     assert results["notion_synced"] == 1
+    # The pooled Notion client is closed once the sync step is done.
+    assert fake_notion.closed
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+import datetime as dt
 import hashlib
+import io
+from functools import lru_cache
 from pathlib import Path
 
 from docx import Document
@@ -9,18 +12,21 @@ from jobs_bot.models import Job, JobProfile, Source
 from jobs_bot.profile_bootstrap import bootstrap_profile
 
 
-def _sha256_file(path: Path) -> str:
-    h = hashlib.sha256()
-    h.update(path.read_bytes())
-    return h.hexdigest()
-
-
-def _write_cv_docx(path: Path, *, text: str) -> str:
+@lru_cache(maxsize=None)
+def _cv_docx_bytes(text: str) -> bytes:
+    # Building a .docx is the slow part; each distinct CV is built once per run.
     doc = Document()
     for line in text.splitlines():
         doc.add_paragraph(line)
-    doc.save(str(path))
-    return _sha256_file(path)
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+def _write_cv_docx(path: Path, *, text: str) -> str:
+    data = _cv_docx_bytes(text)
+    path.write_bytes(data)
+    return hashlib.sha256(data).hexdigest()
 
 
 def test_profile_bootstrap_creates_profile(sqlite_session, tmp_path):
@@ -45,29 +51,20 @@ def test_profile_bootstrap_invalidates_job_profiles_on_cv_change(sqlite_session,
         is_active=1,
         discovered_via="manual",
     )
-    sqlite_session.add(src)
-    sqlite_session.commit()
-
+    now = dt.datetime(2026, 1, 3, 0, 0, 0)
     job = Job(
         job_uid="a" * 40,
-        source_id=src.id,
+        source=src,
         ats_job_id="1",
         title="Backend Engineer",
         company="ACME",
         url="https://example.com",
-        first_seen=sqlite_session.bind.dialect.default_schema_name,  # not used in this test
-        last_seen=sqlite_session.bind.dialect.default_schema_name,   # not used
-        last_checked=sqlite_session.bind.dialect.default_schema_name,  # not used
+        first_seen=now,
+        last_seen=now,
+        last_checked=now,
         raw_json={},
     )
-    # fix required datetime fields
-    import datetime as dt
-    now = dt.datetime(2026, 1, 3, 0, 0, 0)
-    job.first_seen = now
-    job.last_seen = now
-    job.last_checked = now
-
-    sqlite_session.add(job)
+    sqlite_session.add_all([src, job])
     sqlite_session.commit()
 
     profile_id = "p1"
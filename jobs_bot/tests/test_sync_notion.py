@@ -1,59 +1,35 @@
 import datetime as dt
+import threading
+from types import SimpleNamespace
 
-from jobs_bot.models import Job, JobEnrichment, JobProfile, Profile, Source
-from jobs_bot.sync_notion import sync_pending_jobs
+import pytest
+from sqlalchemy import event, select
 
+from jobs_bot import sync_notion
+from jobs_bot.models import JobEnrichment, JobProfile
+from jobs_bot.sync_notion import (
+    _SyncItem,
+    _fit_class_from_score,
+    _partition_sync_items,
+    _penalty_flags_json,
+    _status_for_new_page,
+    _with_create_fields,
+    build_properties_for_update,
+    sync_pending_jobs,
+)
 
-def test_sync_pending_jobs_uses_job_uid_and_profile_as_key(sqlite_session, fake_notion):
-    src = Source(
-        ats_type="lever",
-        company_slug="acme",
-        company_name="ACME",
-        api_base="https://api.lever.co/v0/postings/acme",
-        is_active=1,
-        discovered_via="manual",
-    )
-    sqlite_session.add(src)
-    sqlite_session.commit()
+# CV fingerprint shared by most profiles in this module.
+CV_SHA256_A = "a" * 64
 
-    profile1 = Profile(
-        profile_id="p1",
-        cv_path="/tmp/cv1.docx",
-        cv_sha256="a" * 64,
-        profile_json=None,
-        profile_text="Python",
-        analyzed_at=None,
-        last_error=None,
-    )
-    profile2 = Profile(
-        profile_id="p2",
-        cv_path="/tmp/cv2.docx",
-        cv_sha256="b" * 64,
-        profile_json=None,
-        profile_text="Python",
-        analyzed_at=None,
-        last_error=None,
-    )
-    sqlite_session.add(profile1)
-    sqlite_session.add(profile2)
-
-    now = dt.datetime(2026, 1, 3, 0, 0, 0)
-    job = Job(
-        job_uid="f" * 40,
-        source_id=src.id,
-        ats_job_id="1",
-        title="Backend Engineer",
-        company="ACME",
-        url="https://example.com",
-        first_seen=now,
-        last_seen=now,
-        last_checked=now,
-        raw_json={},
-        raw_text="Python required",
-        fit_score=0,
-        fit_class="No",
-    )
-    sqlite_session.add(job)
+
+def test_sync_pending_jobs_uses_job_uid_and_profile_as_key(
+    sqlite_session, fake_notion, make_source, make_profile, make_job, make_job_profile
+):
+    src = make_source()
+    make_profile("p1", cv_path="/tmp/cv1.docx", cv_sha256=CV_SHA256_A, profile_text="Python")
+    make_profile("p2", cv_path="/tmp/cv2.docx", cv_sha256="b" * 64, profile_text="Python")
+
+    job = make_job(src, "f" * 40, raw_text="Python required", fit_score=0, fit_class="No")
     sqlite_session.add(
         JobEnrichment(
             job_uid=job.job_uid,
@@ -64,21 +40,7 @@ def test_sync_pending_jobs_uses_job_uid_and_profile_as_key(sqlite_session, fake_
             outreach_target="",
         )
     )
-
-    jp2 = JobProfile(
-        job_uid=job.job_uid,
-        profile_id="p2",
-        fit_score=90,
-        fit_class="Good",
-        penalty_flags=None,
-        fit_job_last_checked=now,
-        fit_profile_cv_sha256=profile2.cv_sha256,
-        fit_computed_at=now,
-        notion_page_id=None,
-        notion_last_sync=None,
-        notion_last_error=None,
-    )
-    sqlite_session.add(jp2)
+    make_job_profile(job, "p2", fit_score=90, fit_profile_cv_sha256="b" * 64)
     sqlite_session.commit()
 
     created_p2 = sync_pending_jobs(
@@ -93,20 +55,7 @@ def test_sync_pending_jobs_uses_job_uid_and_profile_as_key(sqlite_session, fake_
     assert page_for_p2 is not None
     assert fake_notion.query_page_id(job_uid=job.job_uid, profile_id="p1") is None
 
-    jp1 = JobProfile(
-        job_uid=job.job_uid,
-        profile_id="p1",
-        fit_score=85,
-        fit_class="Good",
-        penalty_flags={"missing_languages": ["italian"]},
-        fit_job_last_checked=now,
-        fit_profile_cv_sha256=profile1.cv_sha256,
-        fit_computed_at=now,
-        notion_page_id=None,
-        notion_last_sync=None,
-        notion_last_error=None,
-    )
-    sqlite_session.add(jp1)
+    make_job_profile(job, "p1", fit_score=85, penalty_flags={"missing_languages": ["italian"]})
     sqlite_session.commit()
 
     created_p1 = sync_pending_jobs(
@@ -124,3 +73,258 @@ def test_sync_pending_jobs_uses_job_uid_and_profile_as_key(sqlite_session, fake_
 
     payload = fake_notion.pages[page_for_p1]
     assert "Profile" in payload
+
+
+def test_fit_class_and_status_thresholds():
+    assert [_fit_class_from_score(s) for s in (None, -1, 59, 60, 74, 75, 101)] == [
+        "No", "No", "No", "Maybe", "Maybe", "Good", "Good",
+    ]
+    assert [_status_for_new_page(s) for s in (None, -1, 59, 60, 74, 75, 101)] == [
+        "New", "Rejected", "Rejected", "New", "New", "Shortlist", "Shortlist",
+    ]
+
+
+def test_sync_pending_jobs_query_count_is_independent_of_batch_size(
+    sqlite_engine, sqlite_session, fake_notion, make_source, make_profile, make_job, make_job_profile
+):
+    src = make_source(ats_type="greenhouse", api_base="https://boards-api.greenhouse.io/v1/boards/acme")
+    make_profile("p1", cv_sha256=CV_SHA256_A)
+    for i in range(3):
+        job = make_job(src, str(i) * 40, ats_job_id=str(i), title=f"Engineer {i}")
+        sqlite_session.add(JobEnrichment(job_uid=job.job_uid, summary="s", skills_json={"skills": ["Python"]}))
+        make_job_profile(job, "p1")
+    sqlite_session.commit()
+    sqlite_session.expunge_all()
+
+    selects: list[str] = []
+    updates: list[tuple[str, bool]] = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        verb = statement.lstrip().upper()
+        if verb.startswith("SELECT"):
+            selects.append(statement)
+        elif verb.startswith("UPDATE"):
+            updates.append((statement, executemany))
+
+    # The engine is shared by the whole run, so the listener must not outlive the test.
+    event.listen(sqlite_engine, "before_cursor_execute", _count)
+    try:
+        n = sync_pending_jobs(sqlite_session, notion=fake_notion, limit=10, fit_min=60, profile_id="p1")
+    finally:
+        event.remove(sqlite_engine, "before_cursor_execute", _count)
+
+    assert n == 3
+    assert len(fake_notion.created_payloads) == 3
+    assert fake_notion.created_payloads[0]["Source"] == {"select": {"name": "Greenhouse"}}
+    # profile + job_profile/jobs/sources + enrichment + legacy fallback; no per-row lazy loads
+    assert len(selects) == 4
+    # Writebacks of one batch are flushed as a single executemany UPDATE.
+    assert len(updates) == 1 and updates[0][1] is True
+    assert updates[0][0].lstrip().upper().startswith("UPDATE JOB_PROFILE")
+
+
+def test_sync_pending_jobs_query_count_across_commit_batches(
+    sqlite_engine, sqlite_session, fake_notion, make_source, make_profile, make_job, make_job_profile, monkeypatch
+):
+    # Default Session settings (expire_on_commit=True): later batches must not reload rows.
+    monkeypatch.setattr(sync_notion, "_SYNC_COMMIT_EVERY", 2)
+    src = make_source()
+    make_profile("p1", cv_sha256=CV_SHA256_A)
+    for i in range(5):
+        job = make_job(src, str(i) * 40)
+        sqlite_session.add(JobEnrichment(job_uid=job.job_uid, summary="s", skills_json={"skills": ["Python"]}))
+        make_job_profile(job, "p1")
+    sqlite_session.commit()
+    sqlite_session.expunge_all()
+
+    selects: list[str] = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            selects.append(statement)
+
+    event.listen(sqlite_engine, "before_cursor_execute", _count)
+    try:
+        n = sync_pending_jobs(sqlite_session, notion=fake_notion, limit=10, fit_min=60, profile_id="p1")
+    finally:
+        event.remove(sqlite_engine, "before_cursor_execute", _count)
+
+    assert n == 5
+    assert len(fake_notion.created_payloads) == 5
+    # Same fixed count as a single batch: profile, main query, enrichment, legacy fallback.
+    assert len(selects) == 4
+
+
+@pytest.mark.parametrize(("unmapped", "listed"), [(1, False), (2, True)])
+def test_sync_pending_jobs_lists_pages_only_for_many_unmapped_rows(
+    sqlite_session, fake_notion, make_source, make_profile, make_job, make_job_profile, monkeypatch, unmapped, listed
+):
+    monkeypatch.setattr(sync_notion, "_BULK_LOOKUP_MIN_UNMAPPED", 2)
+    src = make_source()
+    make_profile("p1", cv_sha256=CV_SHA256_A)
+    for i in range(unmapped):
+        make_job_profile(make_job(src, str(i) * 40), "p1")
+    sqlite_session.commit()
+
+    listings: list[str] = []
+    list_pages = fake_notion.list_pages_by_profile
+
+    def _list_pages(profile_id: str) -> dict[str, str]:
+        listings.append(profile_id)
+        return list_pages(profile_id)
+
+    monkeypatch.setattr(fake_notion, "list_pages_by_profile", _list_pages)
+
+    assert sync_pending_jobs(sqlite_session, notion=fake_notion, limit=10, fit_min=60, profile_id="p1") == unmapped
+    assert listings == (["p1"] if listed else [])
+    assert len(fake_notion.created_payloads) == unmapped
+
+
+def test_sync_pending_jobs_skips_unchanged_update(
+    sqlite_session, fake_notion, make_source, make_profile, make_job, make_job_profile
+):
+    src = make_source()
+    make_profile("p1", cv_sha256=CV_SHA256_A)
+
+    now = dt.datetime(2026, 1, 3, 8, 0, 0)
+    job = make_job(src, "e" * 40, first_seen=now, last_seen=now, last_checked=now)
+    jp = make_job_profile(job, "p1", fit_job_last_checked=now, fit_computed_at=now)
+    sqlite_session.commit()
+
+    assert sync_pending_jobs(sqlite_session, notion=fake_notion, limit=10, fit_min=60, profile_id="p1") == 1
+    assert len(fake_notion.created_payloads) == 1
+
+    # Re-crawled later the same day: eligible again, but the payload is identical.
+    later = dt.datetime(2026, 1, 3, 20, 0, 0)
+    job.last_checked = later
+    jp.fit_job_last_checked = later
+    jp.notion_last_sync = now
+    sqlite_session.commit()
+
+    assert sync_pending_jobs(sqlite_session, notion=fake_notion, limit=10, fit_min=60, profile_id="p1") == 1
+    assert fake_notion.updated_payloads == []
+    assert jp.notion_last_sync > later
+
+    # A real change is still written.
+    job.title = "Senior Backend Engineer"
+    jp.notion_last_sync = now
+    sqlite_session.commit()
+
+    sync_pending_jobs(sqlite_session, notion=fake_notion, limit=10, fit_min=60, profile_id="p1")
+    assert len(fake_notion.updated_payloads) == 1
+    assert fake_notion.updated_payloads[0]["Job Title"]["title"][0]["text"]["content"] == "Senior Backend Engineer"
+
+
+def test_penalty_flags_json_is_sorted_and_indented():
+    flags = {"missing_languages": ["italiano", "français"], "b": {"diff": 1, "ratio": 1e16}}
+
+    # orjson float format (json.dumps would write 1e+16); the text is fingerprinted.
+    assert _penalty_flags_json(flags) == (
+        '{\n  "b": {\n    "diff": 1,\n    "ratio": 1e16\n  },\n'
+        '  "missing_languages": [\n    "italiano",\n    "français"\n  ]\n}'
+    )
+
+
+def test_create_payload_is_derived_from_update_payload():
+    job = SimpleNamespace(
+        job_uid="u-1",
+        title="Engineer",
+        company="ACME",
+        url="https://example.com/j/1",
+        location_raw=None,
+        workplace_raw=None,
+        salary_text=None,
+        first_seen=dt.datetime(2026, 1, 1),
+        last_checked=dt.datetime(2026, 1, 2),
+        source=None,
+    )
+    job_profile = SimpleNamespace(fit_score=80, penalty_flags={})
+    today = dt.date(2026, 1, 3)
+
+    update = build_properties_for_update(job=job, job_profile=job_profile, enrich=None, profile_id="p", today=today)
+    snapshot = dict(update)
+    create = _with_create_fields(update, job=job, job_profile=job_profile, today=today)
+
+    assert update == snapshot
+    assert "Penalty flags" in update and "Penalty flags" not in create
+    assert create["Status"] == {"status": {"name": _status_for_new_page(80)}}
+    assert create["Job URL"] == {"url": "https://example.com/j/1"}
+    assert create["Summary"] == {"rich_text": []}
+    assert create["Job Title"] is update["Job Title"]
+
+
+def test_sync_pending_jobs_commits_in_batches(
+    sqlite_session, fake_notion, make_source, make_profile, make_job, make_job_profile, monkeypatch
+):
+    monkeypatch.setattr(sync_notion, "_SYNC_COMMIT_EVERY", 2)
+
+    src = make_source()
+    make_profile("p1", cv_sha256=CV_SHA256_A)
+    for i in range(3):
+        ts = dt.datetime(2026, 1, 3, i, 0, 0)
+        job = make_job(
+            src,
+            str(i) * 40,
+            ats_job_id=str(i),
+            title=f"Engineer {i}",
+            first_seen=ts,
+            last_seen=ts,
+            last_checked=ts,
+        )
+        make_job_profile(job, "p1", fit_job_last_checked=ts, fit_computed_at=ts)
+    sqlite_session.commit()
+
+    create_page = fake_notion.create_page
+
+    def _create_then_fail(properties: dict) -> str:
+        if len(fake_notion.created_payloads) == 2:
+            raise ConnectionError("network down")
+        return create_page(properties)
+
+    monkeypatch.setattr(fake_notion, "create_page", _create_then_fail)
+
+    with pytest.raises(ConnectionError):
+        sync_pending_jobs(sqlite_session, notion=fake_notion, limit=10, fit_min=60, profile_id="p1")
+    sqlite_session.rollback()
+
+    synced = sqlite_session.execute(
+        select(JobProfile.job_uid).where(JobProfile.notion_page_id.is_not(None))
+    ).scalars().all()
+    # Rows are processed newest first; the first batch survived the failure.
+    assert sorted(synced) == ["1" * 40, "2" * 40]
+
+
+def test_partition_sync_items_splits_updates_and_creates():
+    mapped = _SyncItem(SimpleNamespace(notion_page_id="p-1"), SimpleNamespace(job_uid="a"))
+    cached = _SyncItem(SimpleNamespace(notion_page_id=None), SimpleNamespace(job_uid="b"))
+    new = _SyncItem(SimpleNamespace(notion_page_id=None), SimpleNamespace(job_uid="c"))
+
+    assert _partition_sync_items([new, cached, mapped], {"b": "p-2"}) == ([cached, mapped], [new])
+    # Without a cache, unmapped rows are resolved later by the per-row lookup.
+    assert _partition_sync_items([new, cached, mapped], None) == ([mapped], [new, cached])
+
+
+def test_sync_pending_jobs_dispatches_notion_writes_concurrently(
+    sqlite_session, fake_notion, make_source, make_profile, make_job, make_job_profile, monkeypatch
+):
+    src = make_source()
+    make_profile("p1", cv_sha256=CV_SHA256_A)
+    for i in range(2):
+        make_job_profile(make_job(src, str(i) * 40, ats_job_id=str(i), title=f"Engineer {i}"), "p1")
+    sqlite_session.commit()
+
+    # Each create waits for the other one: this only completes when both run at once.
+    barrier = threading.Barrier(2, timeout=5)
+    create_page = fake_notion.create_page
+
+    def _create_together(properties: dict) -> str:
+        barrier.wait()
+        return create_page(properties)
+
+    monkeypatch.setattr(fake_notion, "create_page", _create_together)
+
+    n = sync_pending_jobs(sqlite_session, notion=fake_notion, limit=10, fit_min=60, profile_id="p1")
+
+    assert n == 2
+    pages = sqlite_session.execute(select(JobProfile.notion_page_id)).scalars().all()
+    assert len(set(pages)) == 2 and None not in pages
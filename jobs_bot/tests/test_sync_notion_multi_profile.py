@@ -19,6 +19,10 @@ class _FakeNotion:
         self.queries.append({"job_uid": job_uid, "profile_id": profile_id})
         return None
 
+    def list_pages_by_profile(self, profile_id: str) -> dict[str, str]:
+        self.queries.append({"profile_id": profile_id})
+        return {}
+
     def create_page(self, *, properties: dict[str, Any], children=None) -> str:
         self.created.append({"properties": properties})
         return "new-page-id"
@@ -2,36 +2,58 @@ from __future__ import annotations
 
 import datetime as dt
 import hashlib
-import json
 
 from sqlalchemy import select
+from sqlalchemy.orm import joinedload, selectinload
 
+from jobs_bot.api_usage import utcnow_naive
 from jobs_bot.config import get_settings
-from jobs_bot.db import make_session_factory
-from jobs_bot.models import Job, JobEnrichment, Source
+from jobs_bot.db import check_schema, make_session_factory
+from jobs_bot.models import Job, JobEnrichment, JobProfile, Profile, Source
 from jobs_bot.notion_client import NotionClient
 from jobs_bot.sync_notion import sync_pending_jobs
 
+# json.dumps({"test": True}), serialized once.
+_SMOKE_RAW_TEXT = '{"test": true}'
+
 
 def sha1_uid(ats_type: str, company_slug: str, job_id: str) -> str:
     key = f"{ats_type}:{company_slug}:{job_id}".encode("utf-8")
     return hashlib.sha1(key).hexdigest()
 
 
+def _ensure_profile(
+    session, *, profile_id: str, cv_path: str | None, now: dt.datetime
+) -> Profile:
+    """Bootstrap the configured profile, or a placeholder when PROFILES_DIR is unset."""
+    if cv_path:
+        # python-docx is only needed when a CV is configured.
+        from jobs_bot.profile_bootstrap import bootstrap_profile
+
+        profile, _ = bootstrap_profile(session, profile_id=profile_id, cv_path=cv_path, now=now)
+        return profile
+
+    profile = session.get(Profile, profile_id)
+    if not profile:
+        profile = Profile(profile_id=profile_id, cv_path="", cv_sha256="")
+        session.add(profile)
+    return profile
+
+
 def main() -> None:
     settings = get_settings()
     SessionLocal = make_session_factory(settings)
 
-    notion = NotionClient(
+    now = utcnow_naive()
+
+    with SessionLocal() as session, NotionClient(
         token=settings.notion_token,
         version=settings.notion_version,
         data_source_id=settings.notion_data_source_id,
         timeout_s=settings.request_timeout_s,
-    )
-
-    now = dt.datetime.now(dt.UTC).replace(tzinfo=None)
+    ) as notion:
+        check_schema(session)
 
-    with SessionLocal() as session:
         ats_type = "lever"
         company_slug = "testco"
         api_base = "https://api.lever.co/v0/postings/testco"
@@ -50,33 +72,46 @@ def main() -> None:
                 discovered_via="manual",
             )
             session.add(src)
-            session.commit()
 
         job_id = "TEST-001"
         job_uid = sha1_uid(ats_type, company_slug, job_id)
 
-        job = session.get(Job, job_uid)
+        profile = _ensure_profile(
+            session,
+            profile_id=settings.profile_id,
+            cv_path=settings.profile_cv_path,
+            now=now,
+        )
+
+        # One round-trip for the job and its enrichment, one for its profile rows.
+        job = session.execute(
+            select(Job)
+            .options(joinedload(Job.enrichment), selectinload(Job.profiles))
+            .where(Job.job_uid == job_uid)
+        ).scalar_one_or_none()
+        enr = job.enrichment if job else None
+        jp = None
+        if job:
+            jp = next((p for p in job.profiles if p.profile_id == profile.profile_id), None)
+
         if not job:
             job = Job(
                 job_uid=job_uid,
-                source_id=src.id,
+                source=src,
                 ats_job_id=job_id,
                 title="TEST — IT Service Quality Manager (MySQL→Notion)",
                 company="TestCo",
                 url="https://example.com/jobs/test-001",
                 location_raw="Remote (EU)",
                 workplace_raw="Remote",
-                posted_at=None,
                 first_seen=now,
                 last_seen=now,
                 last_checked=now,
                 raw_json={"test": True, "provider": "smoke", "job_id": job_id},
-                raw_text=json.dumps({"test": True}),
+                raw_text=_SMOKE_RAW_TEXT,
                 fit_score=88,
                 fit_class="Good",
-                penalty_flags={"us_only": False, "work_auth": False},
                 salary_text="Not disclosed",
-                status="New",
             )
             session.add(job)
         else:
@@ -85,7 +120,6 @@ def main() -> None:
             job.fit_score = 88
             job.fit_class = "Good"
 
-        enr = session.get(JobEnrichment, job_uid)
         if not enr:
             enr = JobEnrichment(
                 job_uid=job_uid,
@@ -104,6 +138,16 @@ def main() -> None:
             enr.summary = "Smoke test: updated and re-synced."
             enr.enriched_at = now
 
+        if not jp:
+            jp = JobProfile(job_uid=job_uid, profile_id=profile.profile_id)
+            session.add(jp)
+        jp.fit_score = 88
+        jp.fit_class = "Good"
+        jp.penalty_flags = {"us_only": False, "work_auth": False}
+        jp.fit_job_last_checked = now
+        jp.fit_profile_cv_sha256 = profile.cv_sha256
+        jp.fit_computed_at = now
+
         session.commit()
 
         n = sync_pending_jobs(
@@ -111,14 +155,19 @@ def main() -> None:
             notion=notion,
             limit=10,
             fit_min=settings.fit_min,
+            profile_id=profile.profile_id,
         )
-        print(f"Synced {n} job(s) to Notion.")
 
-        job = session.get(Job, job_uid)
-        print("Job UID:", job.job_uid)
-        print("Notion page id:", job.notion_page_id)
-        print("Notion last sync:", job.notion_last_sync)
-        print("Notion last error:", job.notion_last_error)
+        # sync_pending_jobs writes back through this same identity-map instance,
+        # and the session factory sets expire_on_commit=False: no reload needed.
+        print(
+            f"Synced {n} job(s) to Notion.\n"
+            f"Job UID: {jp.job_uid}\n"
+            f"Profile: {jp.profile_id}\n"
+            f"Notion page id: {jp.notion_page_id}\n"
+            f"Notion last sync: {jp.notion_last_sync}\n"
+            f"Notion last error: {jp.notion_last_error}"
+        )
 
 
 if __name__ == "__main__":